@@ -1,17 +1,106 @@
 import getpass
+import hashlib
 import logging
 import os
+import re
+import sys
+import tempfile
+import time
+from collections import OrderedDict
 from typing import Optional, Tuple
 
-from mini_llm_chat.backends.base import User
+from mini_llm_chat.backends.base import Role, User, role_mask
 from mini_llm_chat.database_manager import (
     authenticate_user,
     create_admin_user,
     get_user_by_token,
+    invalidate_user_token,
 )
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of validated tokens so repeated token logins in the same
+# process don't hit the database backend every time. Keyed by token hash so
+# the raw secret is never stored. Bounded FIFO with a per-entry TTL.
+_TOKEN_CACHE: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+_TOKEN_CACHE_MAX = 256
+_TOKEN_CACHE_TTL = 60  # seconds
+
+
+# Matches one KEY=value line, skipping comments and blank lines. Parsing the
+# whole file with one compiled regex avoids per-line strip/split overhead.
+_ENV_LINE_RE = re.compile(r"^\s*([^#=\s][^=]*?)\s*=\s*(.*?)\s*$", re.MULTILINE)
+
+
+def _parse_env_file(env_file: str) -> dict:
+    """Parse an env file into a dict; missing files yield an empty dict."""
+    try:
+        with open(env_file, "r") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    return {m.group(1): m.group(2) for m in _ENV_LINE_RE.finditer(data)}
+
+
+def _atomic_write(payload: str, env_file: str) -> None:
+    """Write payload to env_file atomically with a single buffered write.
+
+    The payload is written to a temp file in the same directory, which is
+    then renamed over the target so a crash mid-write can't leave a
+    truncated file behind.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(env_file) or ".")
+    try:
+        os.write(fd, payload.encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, env_file)
+
+
+def _write_env(env_vars: dict, env_file: str) -> None:
+    """Serialize env vars once and write them atomically."""
+    payload = (
+        "# Mini LLM Chat Environment Variables\n"
+        + "\n".join(f"{key}={value}" for key, value in env_vars.items())
+        + "\n"
+    )
+    _atomic_write(payload, env_file)
+
+
+# Short-lived cache of failed credential checks so retrying the exact same
+# wrong password (a user re-submitting a typo) doesn't re-run the backend's
+# bcrypt verification. Passwords are stored only as a salted digest keyed by
+# a per-process secret, so entries are useless outside this process.
+_FAILED_LOGIN_SALT = os.urandom(16)
+_FAILED_LOGINS: dict = {}
+_FAILED_LOGIN_TTL = 5  # seconds
+
+
+def _failed_login_key(username: str, password: str) -> Tuple[str, bytes]:
+    digest = hashlib.blake2b(
+        password.encode("utf-8"), key=_FAILED_LOGIN_SALT, digest_size=16
+    ).digest()
+    return (username, digest)
+
+
+def _is_recent_failure(key: Tuple[str, bytes]) -> bool:
+    failed_at = _FAILED_LOGINS.get(key)
+    if failed_at is None:
+        return False
+    if time.monotonic() - failed_at < _FAILED_LOGIN_TTL:
+        return True
+    del _FAILED_LOGINS[key]
+    return False
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def invalidate_token(token: str) -> None:
+    _TOKEN_CACHE.pop(_token_cache_key(token), None)
+
 
 class AuthenticationError(Exception):
     pass
@@ -21,7 +110,78 @@ class AuthorizationError(Exception):
     pass
 
 
+def _login_user_batch() -> Optional[Tuple[User, str]]:
+    """Try credentials from piped stdin, two lines per attempt.
+
+    When stdin is not a terminal (scripted/CI logins), username/password
+    pairs are read line by line — consuming only the lines the login needs
+    and leaving the rest of stdin for later consumers (the token-save
+    prompt, chat input). Output is buffered and flushed once instead of
+    per-attempt prints. Returns None if stdin is interactive, unreadable,
+    or already exhausted so the caller falls back to the prompt-driven flow.
+    """
+    try:
+        if sys.stdin.isatty():
+            return None
+    except (OSError, ValueError):
+        return None
+
+    output = ["Authentication Required", "=" * 30]
+    max_attempts = 3
+    pairs_read = 0
+
+    for _ in range(max_attempts):
+        try:
+            username_line = sys.stdin.readline()
+            password_line = sys.stdin.readline() if username_line else ""
+        except (OSError, ValueError):
+            # Unreadable stdin (e.g. a test runner's stub); nothing was
+            # consumed yet on the first attempt, so defer to the prompts
+            if pairs_read:
+                break
+            return None
+        if not username_line:
+            break
+        pairs_read += 1
+
+        username = username_line.strip()
+        password = password_line.rstrip("\r\n")
+        if not username or not password:
+            output.append("Invalid credentials.")
+            continue
+        failure_key = _failed_login_key(username, password)
+        if _is_recent_failure(failure_key):
+            output.append("Invalid credentials.")
+            continue
+        try:
+            user = authenticate_user(username, password)
+        except Exception as e:
+            logger.error("Login error: %s", e)
+            continue
+        if user:
+            token = user.generate_token()
+            logger.info("User '%s' logged in successfully", username)
+            output.append(f"Welcome, {user.username}! (Role: {user.role})")
+            sys.stdout.write("\n".join(output) + "\n")
+            sys.stdout.flush()
+            return user, token
+        _FAILED_LOGINS[failure_key] = time.monotonic()
+        output.append("Invalid credentials.")
+
+    if not pairs_read:
+        return None
+
+    output.append("Authentication failed. Maximum attempts exceeded.")
+    sys.stdout.write("\n".join(output) + "\n")
+    sys.stdout.flush()
+    raise AuthenticationError("Authentication failed after maximum attempts")
+
+
 def login_user() -> Tuple[User, str]:
+    batch_result = _login_user_batch()
+    if batch_result is not None:
+        return batch_result
+
     print("Authentication Required")
     print("=" * 30)
 
@@ -40,14 +200,20 @@ def login_user() -> Tuple[User, str]:
                 print("Password cannot be empty")
                 continue
 
-            # Authenticate user
-            user = authenticate_user(username, password)
+            # Skip the backend (and its bcrypt check) when the exact same
+            # wrong credentials were just rejected
+            failure_key = _failed_login_key(username, password)
+            if _is_recent_failure(failure_key):
+                user = None
+            else:
+                user = authenticate_user(username, password)
             if user:
                 token = user.generate_token()
-                logger.info(f"User '{username}' logged in successfully")
+                logger.info("User '%s' logged in successfully", username)
                 print(f"Welcome, {user.username}! (Role: {user.role})")
                 return user, token
             else:
+                _FAILED_LOGINS[failure_key] = time.monotonic()
                 attempts += 1
                 remaining = max_attempts - attempts
                 if remaining > 0:
@@ -59,7 +225,7 @@ def login_user() -> Tuple[User, str]:
             print("\nLogin cancelled.")
             raise AuthenticationError("Login cancelled by user")
         except Exception as e:
-            logger.error(f"Login error: {e}")
+            logger.error("Login error: %s", e)
             print(f"Login error: {e}")
             attempts += 1
 
@@ -67,28 +233,112 @@ def login_user() -> Tuple[User, str]:
 
 
 def login_with_token(token: str) -> Optional[User]:
+    cache_key = _token_cache_key(token)
+    cached = _TOKEN_CACHE.get(cache_key)
+    if cached:
+        user, cached_at = cached
+        if time.monotonic() - cached_at < _TOKEN_CACHE_TTL:
+            return user
+        del _TOKEN_CACHE[cache_key]
+
     try:
         user = get_user_by_token(token)
         if user:
-            logger.info(f"User '{user.username}' authenticated via token")
+            _TOKEN_CACHE[cache_key] = (user, time.monotonic())
+            while len(_TOKEN_CACHE) > _TOKEN_CACHE_MAX:
+                _TOKEN_CACHE.popitem(last=False)
+            logger.info("User '%s' authenticated via token", user.username)
             return user
         else:
             logger.warning("Invalid or expired token")
             return None
     except Exception as e:
-        logger.error(f"Token authentication error: {e}")
+        logger.error("Token authentication error: %s", e)
         return None
 
 
+# Role mask required for each permission level; unknown levels fail closed.
+_REQUIRED_ROLE_MASKS = {
+    "user": Role.USER,
+    "admin": Role.ADMIN,
+}
+
+
+def _user_role_mask(user: User) -> Role:
+    # Backend users precompute their mask; other user models (e.g. the
+    # SQLAlchemy model in database.py) fall back to mapping the role string.
+    mask = getattr(user, "_role_mask", None)
+    return mask if mask is not None else role_mask(user.role)
+
+
 def require_admin(user: User) -> None:
-    if not user.is_admin():
+    if not _user_role_mask(user) & Role.ADMIN:
         logger.warning(
-            f"User '{user.username}' attempted admin action without privileges"
+            "User '%s' attempted admin action without privileges", user.username
         )
         raise AuthorizationError("Admin privileges required")
 
 
+def _setup_initial_admin_batch() -> Optional[bool]:
+    """Create the initial admin from piped stdin in one pass.
+
+    When stdin is not a terminal (scripted setup), the username, email,
+    password, and confirmation are read as exactly four lines instead of
+    four prompts — the rest of stdin is left untouched for whatever runs
+    next in the same process (typically the login flow). Returns None if
+    stdin is interactive, unreadable, or already exhausted so the caller
+    falls back to the prompt-driven flow.
+    """
+    try:
+        if sys.stdin.isatty():
+            return None
+        username_line = sys.stdin.readline()
+        if not username_line.strip():
+            return None
+        field_lines = [sys.stdin.readline() for _ in range(3)]
+    except (OSError, ValueError):
+        return None
+
+    username = username_line.strip()
+    email = field_lines[0].strip()
+    password = field_lines[1].rstrip("\r\n")
+    confirm_password = field_lines[2].rstrip("\r\n")
+
+    print("Initial Setup - Create Admin User")
+    print("=" * 40)
+
+    if not username:
+        print("Username cannot be empty")
+        return False
+    if not email:
+        print("Email cannot be empty")
+        return False
+    if not password:
+        print("Password cannot be empty")
+        return False
+    if password != confirm_password:
+        print("Passwords do not match")
+        return False
+
+    try:
+        success = create_admin_user(username, email, password)
+    except Exception as e:
+        logger.error("Admin setup error: %s", e)
+        print(f"Setup error: {e}")
+        return False
+
+    if success:
+        print(f"Admin user '{username}' created successfully")
+        return True
+    print(f"Admin user '{username}' already exists")
+    return False
+
+
 def setup_initial_admin() -> bool:
+    batch_result = _setup_initial_admin_batch()
+    if batch_result is not None:
+        return batch_result
+
     print("Initial Setup - Create Admin User")
     print("=" * 40)
 
@@ -126,7 +376,7 @@ def setup_initial_admin() -> bool:
         print("\nSetup cancelled.")
         return False
     except Exception as e:
-        logger.error(f"Admin setup error: {e}")
+        logger.error("Admin setup error: %s", e)
         print(f"Setup error: {e}")
         return False
 
@@ -137,26 +387,18 @@ def get_auth_from_env() -> Optional[str]:
 
 def save_token_to_env_file(token: str, env_file: str = ".env") -> bool:
     try:
-        env_vars = {}
-        if os.path.exists(env_file):
-            with open(env_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#") and "=" in line:
-                        key, value = line.split("=", 1)
-                        env_vars[key.strip()] = value.strip()
-
+        env_vars = _parse_env_file(env_file)
+        if env_vars.get("MINI_LLM_CHAT_TOKEN") == token:
+            logger.debug("Token already saved; skipping rewrite")
+            return True
         env_vars["MINI_LLM_CHAT_TOKEN"] = token
 
-        with open(env_file, "w") as f:
-            f.write("# Mini LLM Chat Environment Variables\n")
-            for key, value in env_vars.items():
-                f.write(f"{key}={value}\n")
+        _write_env(env_vars, env_file)
 
-        logger.info(f"Token saved to {env_file}")
+        logger.info("Token saved to %s", env_file)
         return True
     except Exception as e:
-        logger.error(f"Failed to save token to env file: {e}")
+        logger.error("Failed to save token to env file: %s", e)
         return False
 
 
@@ -183,35 +425,41 @@ def interactive_auth() -> Tuple[User, str]:
 
 
 def check_permissions(user: User, required_role: str = "user") -> bool:
-    if required_role == "admin":
-        return user.is_admin()
-    elif required_role == "user":
-        return True
-    else:
-        logger.warning(f"Unknown role requirement: {required_role}")
+    required_mask = _REQUIRED_ROLE_MASKS.get(required_role)
+    if required_mask is None:
+        logger.warning("Unknown role requirement: %s", required_role)
         return False
+    return bool(_user_role_mask(user) & required_mask)
 
 
 def logout_user(token: str) -> bool:
     try:
+        invalidate_token(token)
+        invalidate_user_token(token)
         env_file = ".env"
-        if os.path.exists(env_file):
-            env_vars = {}
-            with open(env_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#") and "=" in line:
-                        key, value = line.split("=", 1)
-                        if key.strip() != "MINI_LLM_CHAT_TOKEN":
-                            env_vars[key.strip()] = value.strip()
-
-            with open(env_file, "w") as f:
-                f.write("# Mini LLM Chat Environment Variables\n")
-                for key, value in env_vars.items():
-                    f.write(f"{key}={value}\n")
+        try:
+            with open(env_file, "rb") as f:
+                lines = f.read().decode("utf-8").splitlines()
+        except FileNotFoundError:
+            logger.info("User logged out successfully")
+            return True
+
+        # One pass: keep every env assignment except the token itself
+        kept = [
+            line
+            for line in lines
+            if "=" in line
+            and not line.lstrip().startswith("#")
+            and line.split("=", 1)[0].strip() != "MINI_LLM_CHAT_TOKEN"
+        ]
+        if kept or len(kept) != len(lines):
+            _atomic_write(
+                "# Mini LLM Chat Environment Variables\n" + "\n".join(kept) + "\n",
+                env_file,
+            )
 
         logger.info("User logged out successfully")
         return True
     except Exception as e:
-        logger.error(f"Logout error: {e}")
+        logger.error("Logout error: %s", e)
         return False
@@ -3,10 +3,20 @@ Database Backends Module
 
 This module provides different database backend implementations for the Mini LLM Chat application.
 It includes PostgreSQL backend for full functionality and in-memory backend for lightweight usage.
+
+PostgreSQLBackend is imported lazily so that memory-only runs don't pay the
+SQLAlchemy/psycopg2 import cost at startup.
 """
 
 from .base import DatabaseBackend
 from .memory import InMemoryBackend
-from .postgresql import PostgreSQLBackend
 
 __all__ = ["DatabaseBackend", "InMemoryBackend", "PostgreSQLBackend"]
+
+
+def __getattr__(name: str):
+    if name == "PostgreSQLBackend":
+        from .postgresql import PostgreSQLBackend
+
+        return PostgreSQLBackend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,12 +7,39 @@ It provides a consistent API for database operations regardless of the underlyin
 
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime
+from enum import IntFlag
 from typing import List, Optional
 
 
+class Role(IntFlag):
+    """Bitmask representation of user roles.
+
+    Admin users carry the USER bit as well, so permission checks reduce to a
+    single bitwise AND instead of chained string comparisons.
+    """
+
+    USER = 1
+    ADMIN = 2
+
+
+_ROLE_MASKS = {
+    "user": Role.USER,
+    "admin": Role.USER | Role.ADMIN,
+}
+
+
+def role_mask(role: str) -> Role:
+    """Map a role string to its bitmask; unknown roles get an empty mask."""
+    return _ROLE_MASKS.get(role, Role(0))
+
+
 class DatabaseBackend(ABC):
     """Abstract base class for database backends."""
 
+    # Set by the first successful ensure_database_ready() so callers can
+    # skip redundant schema probes and initialization round-trips.
+    _db_ready: bool = False
+
     @abstractmethod
     def init_db(self) -> None:
         """Initialize database tables/structures."""
@@ -51,6 +78,24 @@ class DatabaseBackend(ABC):
         """Add a message to a conversation."""
         pass
 
+    def add_messages(
+        self, conversation_id: int, rows: List[tuple]
+    ) -> List["Message"]:
+        """Add several messages to a conversation in one batch.
+
+        ``rows`` is a list of (role, content, token_count) tuples. The default
+        falls back to per-message inserts; backends with real batch support
+        override this. Returns the created messages, or an empty list if any
+        insert failed.
+        """
+        messages = []
+        for role, content, token_count in rows:
+            message = self.add_message(conversation_id, role, content, token_count)
+            if message is None:
+                return []
+            messages.append(message)
+        return messages
+
     @abstractmethod
     def get_conversation_messages(
         self, conversation_id: int, limit: Optional[int] = None
@@ -75,6 +120,21 @@ class DatabaseBackend(ABC):
         """Return information about this backend."""
         pass
 
+    def ensure_database_ready(self) -> bool:
+        """Initialize the database; return True if no admin setup is needed.
+
+        Backends with richer readiness checks (schema probing, admin user
+        detection) override this; the default simply initializes structures.
+        """
+        if not self._db_ready:
+            self.init_db()
+            self._db_ready = True
+        return True
+
+    def get_session_user(self) -> Optional["User"]:
+        """Return the default session user, or None if the backend has none."""
+        return None
+
 
 class User:
     """User model interface that all backends must implement."""
@@ -95,6 +155,7 @@ class User:
         self.email = email
         self.hashed_password = hashed_password
         self.role = role
+        self._role_mask = _ROLE_MASKS.get(role, Role(0))
         self.is_active = is_active
         self.created_at = created_at or datetime.now(UTC)
         self.last_login = last_login
@@ -118,7 +179,7 @@ class User:
 
     def is_admin(self) -> bool:
         """Check if user has admin role."""
-        return self.role == "admin"
+        return bool(self._role_mask & Role.ADMIN)
 
     def generate_token(self) -> str:
         """Generate JWT token for the user."""
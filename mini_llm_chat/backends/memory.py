@@ -38,10 +38,34 @@ class InMemoryBackend(DatabaseBackend):
         # Session storage for temporary users
         self.session_users: Dict[str, BaseUser] = {}
 
+        # Static portion of the backend info; live stats are merged in per
+        # call so repeated info queries don't rebuild the whole dict.
+        self._info = {
+            "name": "In-Memory",
+            "type": "memory",
+            "persistent": False,
+            "features": [
+                "basic_chat",
+                "session_auth",
+                "temporary_conversations",
+                "rate_limiting",
+            ],
+            "limitations": [
+                "no_persistence",
+                "no_user_management",
+                "session_only",
+                "no_admin_functions",
+            ],
+        }
+
         logger.info("In-memory backend initialized")
 
     def init_db(self) -> None:
         """Initialize database tables/structures."""
+        # Already initialized; don't create a duplicate session user
+        if "session_user" in self.username_to_id:
+            return
+
         # Create a default session user for immediate use
         session_user = BaseUser(
             id=self._next_user_id,
@@ -269,21 +293,7 @@ class InMemoryBackend(DatabaseBackend):
     def get_backend_info(self) -> dict:
         """Return information about this backend."""
         return {
-            "name": "In-Memory",
-            "type": "memory",
-            "persistent": False,
-            "features": [
-                "basic_chat",
-                "session_auth",
-                "temporary_conversations",
-                "rate_limiting",
-            ],
-            "limitations": [
-                "no_persistence",
-                "no_user_management",
-                "session_only",
-                "no_admin_functions",
-            ],
+            **self._info,
             "stats": {
                 "users": len(self.users),
                 "conversations": len(self.conversations),
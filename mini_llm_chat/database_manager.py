@@ -1,7 +1,10 @@
+import hashlib
 import logging
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
-from .backends import DatabaseBackend, InMemoryBackend, PostgreSQLBackend
+from .backends import DatabaseBackend, InMemoryBackend
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +14,20 @@ class DatabaseConnectionError(Exception):
 
 
 class DatabaseManager:
+    # get_backend is a slot, not a method: it holds whichever accessor
+    # matches the manager's state so the hot path skips state checks.
+    __slots__ = ("backend", "_initialized", "get_backend")
+
     def __init__(self, backend: Optional[DatabaseBackend] = None):
         self.backend = backend
         self._initialized = False
+        self.get_backend = self._get_backend_uninitialized
+
+    def _get_backend_uninitialized(self) -> DatabaseBackend:
+        raise RuntimeError("Database backend not initialized")
+
+    def _get_backend_ready(self) -> DatabaseBackend:
+        return self.backend
 
     def initialize_backend(
         self,
@@ -30,12 +44,15 @@ class DatabaseManager:
         elif backend_type == "postgresql":
             logger.info("Initializing PostgreSQL database backend")
             try:
+                # Imported lazily so memory-only runs skip SQLAlchemy/psycopg2
+                from .backends.postgresql import PostgreSQLBackend
+
                 self.backend = PostgreSQLBackend(database_url)
                 # Perform comprehensive PostgreSQL system checks
                 self.backend.ensure_postgresql_system_ready()
             except Exception as e:
                 if fallback_to_memory:
-                    logger.warning(f"PostgreSQL initialization failed: {e}")
+                    logger.warning("PostgreSQL initialization failed: %s", e)
                     logger.info("Falling back to in-memory backend")
                     self.backend = InMemoryBackend()
                 else:
@@ -48,48 +65,43 @@ class DatabaseManager:
                 logger.info(
                     "Auto-detecting database backend (trying PostgreSQL first)"
                 )
+                from .backends.postgresql import PostgreSQLBackend
+
                 self.backend = PostgreSQLBackend(database_url)
                 # Perform comprehensive PostgreSQL system checks
                 self.backend.ensure_postgresql_system_ready()
                 logger.info("Successfully initialized PostgreSQL backend")
             except Exception as e:
-                logger.warning(f"PostgreSQL not available: {e}")
+                logger.warning("PostgreSQL not available: %s", e)
                 logger.info("Using in-memory backend")
                 self.backend = InMemoryBackend()
         else:
             raise ValueError(f"Unknown backend type: {backend_type}")
 
-        # Initialize the backend
+        # Initialize the backend, unless it already verified its own
+        # readiness during construction/system checks
         try:
-            # For PostgreSQL backends, use smart initialization
-            if hasattr(self.backend, "ensure_database_ready"):
+            if not getattr(self.backend, "_db_ready", False):
                 admin_needed = not self.backend.ensure_database_ready()
                 if admin_needed:
                     logger.info("Database ready but no admin users found")
                     # We'll handle admin user creation in the CLI
-            else:
-                # For other backends, use traditional initialization
-                self.backend.init_db()
 
             self._initialized = True
+            self.get_backend = self._get_backend_ready
+            global _BACKEND
+            _BACKEND = self.backend
             backend_name = self.backend.get_backend_info()["name"]
-            logger.info(f"Database backend initialized: {backend_name}")
+            logger.info("Database backend initialized: %s", backend_name)
             return self.backend
         except Exception as e:
             raise DatabaseConnectionError(f"Backend initialization failed: {e}")
 
-    def get_backend(self) -> DatabaseBackend:
-        if not self.backend or not self._initialized:
-            raise RuntimeError("Database backend not initialized")
-        return self.backend
-
     def get_backend_info(self) -> dict:
         if not self.backend:
             return {"name": "None", "initialized": False}
 
-        info = self.backend.get_backend_info()
-        info["initialized"] = self._initialized
-        return info
+        return {**self.backend.get_backend_info(), "initialized": self._initialized}
 
     def supports_persistence(self) -> bool:
         if not self.backend:
@@ -114,11 +126,39 @@ class DatabaseManager:
 
 _db_manager = DatabaseManager()
 
+# Cached reference to the initialized backend so the module-level convenience
+# functions skip the manager indirection on every call. Populated by
+# initialize_backend and lazily by _get_backend.
+_BACKEND: Optional[DatabaseBackend] = None
+
 
 def get_database_manager() -> DatabaseManager:
     return _db_manager
 
 
+def _get_backend() -> DatabaseBackend:
+    global _BACKEND
+    if _BACKEND is None:
+        _BACKEND = get_database_manager().get_backend()
+    return _BACKEND
+
+
+# Per-process cache of token lookups so subsystems that revalidate a token on
+# every request hit a dict instead of the backend. Keyed by token hash (the
+# raw secret is never stored) with a bounded size and per-entry TTL.
+_USER_TOKEN_CACHE: "OrderedDict[bytes, Tuple[object, float]]" = OrderedDict()
+_USER_TOKEN_CACHE_MAX = 512
+_USER_TOKEN_CACHE_TTL = 60  # seconds
+
+
+def _user_token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def invalidate_user_token(token: str) -> None:
+    _USER_TOKEN_CACHE.pop(_user_token_cache_key(token), None)
+
+
 def initialize_database(
     backend_type: str = "auto",
     fallback_to_memory: bool = False,
@@ -140,49 +180,51 @@ def initialize_database(
 
 
 def init_db() -> None:
-    backend = get_database_manager().get_backend()
-    backend.init_db()
+    _get_backend().init_db()
 
 
 def create_admin_user(username: str, email: str, password: str) -> bool:
-    backend = get_database_manager().get_backend()
-    return backend.create_admin_user(username, email, password)
+    return _get_backend().create_admin_user(username, email, password)
 
 
 def authenticate_user(username: str, password: str):
-    backend = get_database_manager().get_backend()
-    return backend.authenticate_user(username, password)
+    return _get_backend().authenticate_user(username, password)
 
 
 def get_user_by_token(token: str):
-    backend = get_database_manager().get_backend()
-    return backend.get_user_by_token(token)
+    cache_key = _user_token_cache_key(token)
+    cached = _USER_TOKEN_CACHE.get(cache_key)
+    if cached:
+        user, cached_at = cached
+        if time.monotonic() - cached_at < _USER_TOKEN_CACHE_TTL:
+            return user
+        del _USER_TOKEN_CACHE[cache_key]
+
+    user = _get_backend().get_user_by_token(token)
+    if user:
+        _USER_TOKEN_CACHE[cache_key] = (user, time.monotonic())
+        while len(_USER_TOKEN_CACHE) > _USER_TOKEN_CACHE_MAX:
+            _USER_TOKEN_CACHE.popitem(last=False)
+    return user
 
 
 def create_conversation(user_id: int, title: Optional[str] = None):
-    backend = get_database_manager().get_backend()
-    return backend.create_conversation(user_id, title)
+    return _get_backend().create_conversation(user_id, title)
 
 
 def add_message(
     conversation_id: int, role: str, content: str, token_count: Optional[int] = None
 ):
-    backend = get_database_manager().get_backend()
-    return backend.add_message(conversation_id, role, content, token_count)
+    return _get_backend().add_message(conversation_id, role, content, token_count)
 
 
 def get_conversation_messages(conversation_id: int, limit: Optional[int] = None):
-    backend = get_database_manager().get_backend()
-    return backend.get_conversation_messages(conversation_id, limit)
+    return _get_backend().get_conversation_messages(conversation_id, limit)
 
 
 def truncate_conversation_messages(conversation_id: int, max_messages: int) -> bool:
-    backend = get_database_manager().get_backend()
-    return backend.truncate_conversation_messages(conversation_id, max_messages)
+    return _get_backend().truncate_conversation_messages(conversation_id, max_messages)
 
 
 def get_session_user():
-    backend = get_database_manager().get_backend()
-    if hasattr(backend, "get_session_user"):
-        return backend.get_session_user()
-    return None
+    return _get_backend().get_session_user()
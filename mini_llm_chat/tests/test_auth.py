@@ -5,11 +5,13 @@ This module contains comprehensive unit tests for the authentication functionali
 It tests user login, token management, authorization, and admin setup.
 """
 
+import io
 import os
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
+import mini_llm_chat.auth as auth
 from mini_llm_chat.auth import (
     AuthenticationError,
     AuthorizationError,
@@ -47,6 +49,10 @@ class TestAuthorizationError:
 class TestLoginUser:
     """Test cases for login_user function."""
 
+    def setup_method(self):
+        """Clear the failed-login cache between tests."""
+        auth._FAILED_LOGINS.clear()
+
     @patch("mini_llm_chat.auth.authenticate_user")
     @patch("getpass.getpass")
     @patch("builtins.input")
@@ -92,7 +98,28 @@ class TestLoginUser:
         ):
             login_user()
 
-        assert mock_authenticate.call_count == 3  # Should try 3 times
+        # Identical wrong credentials are served from the failed-login cache,
+        # so the backend is only consulted for the first attempt
+        assert mock_authenticate.call_count == 1
+
+    @patch("mini_llm_chat.auth.authenticate_user")
+    @patch("getpass.getpass")
+    @patch("builtins.input")
+    @patch("builtins.print")
+    def test_login_user_distinct_failures_hit_backend(
+        self, mock_print, mock_input, mock_getpass, mock_authenticate
+    ):
+        """Test that each distinct wrong password is checked by the backend."""
+        mock_input.return_value = "testuser"
+        mock_getpass.side_effect = ["wrong1", "wrong2", "wrong3"]
+        mock_authenticate.return_value = None
+
+        with pytest.raises(
+            AuthenticationError, match="Authentication failed after maximum attempts"
+        ):
+            login_user()
+
+        assert mock_authenticate.call_count == 3
 
     @patch("getpass.getpass")
     @patch("builtins.input")
@@ -167,9 +194,91 @@ class TestLoginUser:
             login_user()
 
 
+class TestLoginUserBatch:
+    """Test cases for the piped-stdin login fast path."""
+
+    def setup_method(self):
+        """Clear the failed-login cache between tests."""
+        auth._FAILED_LOGINS.clear()
+
+    @patch("mini_llm_chat.auth.authenticate_user")
+    def test_login_user_batch_success(self, mock_authenticate):
+        """Test batch login with piped credentials."""
+        mock_user = User(
+            id=1, username="testuser", email="test@example.com", role="user"
+        )
+        mock_user.generate_token = MagicMock(return_value="test.jwt.token")
+        mock_authenticate.return_value = mock_user
+
+        with patch("sys.stdin", io.StringIO("testuser\npassword123\n")):
+            user, token = login_user()
+
+        assert user == mock_user
+        assert token == "test.jwt.token"
+        mock_authenticate.assert_called_once_with("testuser", "password123")
+
+    @patch("mini_llm_chat.auth.authenticate_user")
+    def test_login_user_batch_leaves_remaining_stdin(self, mock_authenticate):
+        """Batch login must not consume input meant for later prompts."""
+        mock_user = User(
+            id=1, username="testuser", email="test@example.com", role="user"
+        )
+        mock_user.generate_token = MagicMock(return_value="test.jwt.token")
+        mock_authenticate.return_value = mock_user
+
+        stdin = io.StringIO("testuser\npassword123\ny\nhello\n")
+        with patch("sys.stdin", stdin):
+            login_user()
+
+        # The save-token prompt and chat input are still on stdin
+        assert stdin.readline() == "y\n"
+        assert stdin.readline() == "hello\n"
+
+    @patch("mini_llm_chat.auth.authenticate_user")
+    def test_login_user_batch_all_attempts_fail(self, mock_authenticate):
+        """Test batch login when every piped credential pair is invalid."""
+        mock_authenticate.return_value = None
+
+        piped = "user1\nwrong1\nuser2\nwrong2\nuser3\nwrong3\n"
+        with patch("sys.stdin", io.StringIO(piped)):
+            with pytest.raises(
+                AuthenticationError,
+                match="Authentication failed after maximum attempts",
+            ):
+                login_user()
+
+        assert mock_authenticate.call_count == 3
+
+    @patch("getpass.getpass")
+    @patch("builtins.input")
+    @patch("builtins.print")
+    def test_login_user_batch_empty_stdin_falls_back(
+        self, mock_print, mock_input, mock_getpass
+    ):
+        """Test that empty piped stdin falls back to the interactive flow."""
+        mock_input.return_value = "testuser"
+        mock_getpass.return_value = "password123"
+
+        with patch("mini_llm_chat.auth.authenticate_user") as mock_authenticate:
+            mock_user = User(
+                id=1, username="testuser", email="test@example.com", role="user"
+            )
+            mock_user.generate_token = MagicMock(return_value="test.jwt.token")
+            mock_authenticate.return_value = mock_user
+
+            with patch("sys.stdin", io.StringIO("")):
+                user, token = login_user()
+
+            assert user == mock_user
+
+
 class TestLoginWithToken:
     """Test cases for login_with_token function."""
 
+    def setup_method(self):
+        """Clear the token validation cache between tests."""
+        auth._TOKEN_CACHE.clear()
+
     @patch("mini_llm_chat.auth.get_user_by_token")
     def test_login_with_token_success(self, mock_get_user):
         """Test successful token authentication."""
@@ -201,6 +310,55 @@ class TestLoginWithToken:
 
         assert result is None
 
+    @patch("mini_llm_chat.auth.get_user_by_token")
+    def test_login_with_token_cached(self, mock_get_user):
+        """Test that repeated validations of the same token hit the cache."""
+        mock_user = User(
+            id=1, username="testuser", email="test@example.com", role="user"
+        )
+        mock_get_user.return_value = mock_user
+
+        first = login_with_token("repeated.jwt.token")
+        second = login_with_token("repeated.jwt.token")
+
+        assert first == mock_user
+        assert second == mock_user
+        # Backend should only be consulted once; the second call is a cache hit
+        mock_get_user.assert_called_once_with("repeated.jwt.token")
+
+    @patch("mini_llm_chat.auth.get_user_by_token")
+    def test_login_with_token_cache_expiry(self, mock_get_user):
+        """Test that expired cache entries trigger a fresh backend lookup."""
+        mock_user = User(
+            id=1, username="testuser", email="test@example.com", role="user"
+        )
+        mock_get_user.return_value = mock_user
+
+        login_with_token("expiring.jwt.token")
+
+        # Age the cached entry past the TTL
+        key = auth._token_cache_key("expiring.jwt.token")
+        user, cached_at = auth._TOKEN_CACHE[key]
+        auth._TOKEN_CACHE[key] = (user, cached_at - auth._TOKEN_CACHE_TTL - 1)
+
+        login_with_token("expiring.jwt.token")
+
+        assert mock_get_user.call_count == 2
+
+    @patch("mini_llm_chat.auth.get_user_by_token")
+    def test_invalidate_token_removes_cache_entry(self, mock_get_user):
+        """Test that invalidate_token forces the next login to revalidate."""
+        mock_user = User(
+            id=1, username="testuser", email="test@example.com", role="user"
+        )
+        mock_get_user.return_value = mock_user
+
+        login_with_token("invalidated.jwt.token")
+        auth.invalidate_token("invalidated.jwt.token")
+        login_with_token("invalidated.jwt.token")
+
+        assert mock_get_user.call_count == 2
+
 
 class TestRequireAdmin:
     """Test cases for require_admin function."""
@@ -314,6 +472,52 @@ class TestSetupInitialAdmin:
 
         assert result is False
 
+    @patch("mini_llm_chat.auth.create_admin_user")
+    @patch("builtins.print")
+    def test_setup_initial_admin_batch_success(self, mock_print, mock_create_admin):
+        """Test batch admin setup with piped fields."""
+        mock_create_admin.return_value = True
+
+        piped = "admin\nadmin@example.com\npassword123\npassword123\n"
+        with patch("sys.stdin", io.StringIO(piped)):
+            result = setup_initial_admin()
+
+        assert result is True
+        mock_create_admin.assert_called_once_with(
+            "admin", "admin@example.com", "password123"
+        )
+
+    @patch("mini_llm_chat.auth.create_admin_user")
+    @patch("builtins.print")
+    def test_setup_initial_admin_batch_leaves_remaining_stdin(
+        self, mock_print, mock_create_admin
+    ):
+        """Batch setup must consume exactly four lines of piped stdin."""
+        mock_create_admin.return_value = True
+
+        piped = "admin\nadmin@example.com\npassword123\npassword123\nadmin\npassword123\n"
+        stdin = io.StringIO(piped)
+        with patch("sys.stdin", stdin):
+            result = setup_initial_admin()
+
+        assert result is True
+        # The login credentials for the same bootstrap script are still there
+        assert stdin.readline() == "admin\n"
+        assert stdin.readline() == "password123\n"
+
+    @patch("mini_llm_chat.auth.create_admin_user")
+    @patch("builtins.print")
+    def test_setup_initial_admin_batch_password_mismatch(
+        self, mock_print, mock_create_admin
+    ):
+        """Test batch admin setup with mismatched password confirmation."""
+        piped = "admin\nadmin@example.com\npassword123\ndifferent\n"
+        with patch("sys.stdin", io.StringIO(piped)):
+            result = setup_initial_admin()
+
+        assert result is False
+        mock_create_admin.assert_not_called()
+
     @patch("builtins.input")
     @patch("builtins.print")
     def test_setup_initial_admin_keyboard_interrupt(self, mock_print, mock_input):
@@ -360,41 +564,46 @@ class TestGetAuthFromEnv:
 class TestSaveTokenToEnvFile:
     """Test cases for save_token_to_env_file function."""
 
-    @patch(
-        "builtins.open", new_callable=mock_open, read_data="OPENAI_API_KEY=sk-test\n"
-    )
-    @patch("os.path.exists")
-    def test_save_token_to_env_file_new_file(self, mock_exists, mock_file):
+    def test_save_token_to_env_file_new_file(self, tmp_path):
         """Test saving token to new env file."""
-        mock_exists.return_value = False
+        env_file = tmp_path / ".env"
 
-        result = save_token_to_env_file("test.jwt.token")
+        result = save_token_to_env_file("test.jwt.token", str(env_file))
 
         assert result is True
-        mock_file.assert_called()
-
-    @patch(
-        "builtins.open",
-        new_callable=mock_open,
-        read_data="OPENAI_API_KEY=sk-test\nOTHER_VAR=value\n",
-    )
-    @patch("os.path.exists")
-    def test_save_token_to_env_file_existing_file(self, mock_exists, mock_file):
+        assert "MINI_LLM_CHAT_TOKEN=test.jwt.token" in env_file.read_text()
+
+    def test_save_token_to_env_file_existing_file(self, tmp_path):
         """Test saving token to existing env file."""
-        mock_exists.return_value = True
+        env_file = tmp_path / ".env"
+        env_file.write_text("OPENAI_API_KEY=sk-test\nOTHER_VAR=value\n")
 
-        result = save_token_to_env_file("test.jwt.token")
+        result = save_token_to_env_file("test.jwt.token", str(env_file))
 
         assert result is True
-        # Should read and write
-        assert mock_file.call_count >= 2
+        content = env_file.read_text()
+        # Existing variables are preserved alongside the new token
+        assert "OPENAI_API_KEY=sk-test" in content
+        assert "OTHER_VAR=value" in content
+        assert "MINI_LLM_CHAT_TOKEN=test.jwt.token" in content
+
+    @patch("mini_llm_chat.auth._write_env")
+    def test_save_token_to_env_file_unchanged_skips_write(
+        self, mock_write_env, tmp_path
+    ):
+        """Test that an already-saved token doesn't rewrite the file."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("MINI_LLM_CHAT_TOKEN=test.jwt.token\n")
 
-    @patch("builtins.open")
-    @patch("os.path.exists")
-    def test_save_token_to_env_file_exception(self, mock_exists, mock_file):
+        result = save_token_to_env_file("test.jwt.token", str(env_file))
+
+        assert result is True
+        mock_write_env.assert_not_called()
+
+    @patch("mini_llm_chat.auth._write_env")
+    def test_save_token_to_env_file_exception(self, mock_write_env):
         """Test saving token with file exception."""
-        mock_exists.return_value = False
-        mock_file.side_effect = Exception("File error")
+        mock_write_env.side_effect = Exception("File error")
 
         result = save_token_to_env_file("test.jwt.token")
 
@@ -572,36 +781,34 @@ class TestCheckPermissions:
 class TestLogoutUser:
     """Test cases for logout_user function."""
 
-    @patch(
-        "builtins.open",
-        new_callable=mock_open,
-        read_data="OPENAI_API_KEY=sk-test\nMINI_LLM_CHAT_TOKEN=old.token\nOTHER_VAR=value\n",
-    )
-    @patch("os.path.exists")
-    def test_logout_user_success(self, mock_exists, mock_file):
+    def test_logout_user_success(self, tmp_path, monkeypatch):
         """Test successful user logout."""
-        mock_exists.return_value = True
+        monkeypatch.chdir(tmp_path)
+        env_file = tmp_path / ".env"
+        env_file.write_text(
+            "OPENAI_API_KEY=sk-test\nMINI_LLM_CHAT_TOKEN=old.token\nOTHER_VAR=value\n"
+        )
 
         result = logout_user("old.token")
 
         assert result is True
-        # Should read and write the file
-        assert mock_file.call_count >= 2
+        content = env_file.read_text()
+        # Token is removed while other variables are preserved
+        assert "MINI_LLM_CHAT_TOKEN" not in content
+        assert "OPENAI_API_KEY=sk-test" in content
+        assert "OTHER_VAR=value" in content
 
-    @patch("os.path.exists")
-    def test_logout_user_no_env_file(self, mock_exists):
+    def test_logout_user_no_env_file(self, tmp_path, monkeypatch):
         """Test logout when no env file exists."""
-        mock_exists.return_value = False
+        monkeypatch.chdir(tmp_path)
 
         result = logout_user("some.token")
 
         assert result is True  # Should still succeed
 
     @patch("builtins.open")
-    @patch("os.path.exists")
-    def test_logout_user_file_error(self, mock_exists, mock_file):
+    def test_logout_user_file_error(self, mock_file):
         """Test logout with file error."""
-        mock_exists.return_value = True
         mock_file.side_effect = Exception("File error")
 
         result = logout_user("some.token")
@@ -41,6 +41,17 @@ class TestInMemoryBackend:
         )
         assert not success
 
+    def test_create_admin_user_existing_skips_hashing(self):
+        """Existing-user calls should bail out before hashing the password."""
+        self.backend.create_admin_user("admin", "admin@test.com", "password123")
+
+        with patch("bcrypt.hashpw") as mock_hashpw:
+            success = self.backend.create_admin_user(
+                "admin", "admin@test.com", "password123"
+            )
+            assert not success
+            mock_hashpw.assert_not_called()
+
     def test_authenticate_user(self):
         """Test user authentication."""
         # Create a user first
@@ -85,6 +96,26 @@ class TestInMemoryBackend:
         assert message.role == "user"
         assert message.token_count == 10
 
+    def test_add_messages_batch(self):
+        """Test adding several messages in one batch."""
+        session_user = self.backend.get_session_user()
+        conversation = self.backend.create_conversation(session_user.id)
+
+        rows = [
+            ("system", "System message", 5),
+            ("user", "User message", 10),
+            ("assistant", "Assistant message", 15),
+        ]
+        messages = self.backend.add_messages(conversation.id, rows)
+
+        assert len(messages) == 3
+        assert [msg.role for msg in messages] == ["system", "user", "assistant"]
+        assert messages[1].token_count == 10
+
+        # Batch inserts are visible through the normal read path
+        stored = self.backend.get_conversation_messages(conversation.id)
+        assert len(stored) == 3
+
     def test_get_conversation_messages(self):
         """Test retrieving conversation messages."""
         # Create conversation and add messages
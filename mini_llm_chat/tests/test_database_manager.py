@@ -9,6 +9,7 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
+import mini_llm_chat.database_manager as database_manager
 from mini_llm_chat.backends import InMemoryBackend, PostgreSQLBackend
 from mini_llm_chat.database_manager import (
     DatabaseConnectionError,
@@ -34,7 +35,7 @@ class TestDatabaseManager:
         assert not backend.supports_persistence()
         assert self.manager._initialized
 
-    @patch("mini_llm_chat.database_manager.PostgreSQLBackend")
+    @patch("mini_llm_chat.backends.postgresql.PostgreSQLBackend")
     def test_initialize_postgresql_backend(self, mock_postgresql):
         """Test initializing PostgreSQL backend."""
         mock_backend = Mock()
@@ -44,6 +45,7 @@ class TestDatabaseManager:
         }
         mock_backend.supports_persistence.return_value = True
         mock_backend.ensure_database_ready.return_value = True
+        mock_backend._db_ready = False
         mock_postgresql.return_value = mock_backend
 
         backend = self.manager.initialize_backend("postgresql")
@@ -52,7 +54,7 @@ class TestDatabaseManager:
         mock_postgresql.assert_called_once()
         mock_backend.ensure_database_ready.assert_called_once()
 
-    @patch("mini_llm_chat.database_manager.PostgreSQLBackend")
+    @patch("mini_llm_chat.backends.postgresql.PostgreSQLBackend")
     def test_initialize_postgresql_with_fallback(self, mock_postgresql):
         """Test PostgreSQL initialization with fallback to memory."""
         # Make PostgreSQL initialization fail
@@ -63,7 +65,7 @@ class TestDatabaseManager:
         assert isinstance(backend, InMemoryBackend)
         assert backend.get_backend_info()["type"] == "memory"
 
-    @patch("mini_llm_chat.database_manager.PostgreSQLBackend")
+    @patch("mini_llm_chat.backends.postgresql.PostgreSQLBackend")
     def test_initialize_postgresql_without_fallback(self, mock_postgresql):
         """Test PostgreSQL initialization without fallback."""
         # Make PostgreSQL initialization fail
@@ -72,7 +74,7 @@ class TestDatabaseManager:
         with pytest.raises(DatabaseConnectionError):
             self.manager.initialize_backend("postgresql", fallback_to_memory=False)
 
-    @patch("mini_llm_chat.database_manager.PostgreSQLBackend")
+    @patch("mini_llm_chat.backends.postgresql.PostgreSQLBackend")
     def test_initialize_auto_backend_postgresql_success(self, mock_postgresql):
         """Test auto backend selection with successful PostgreSQL."""
         mock_backend = Mock()
@@ -87,7 +89,7 @@ class TestDatabaseManager:
         assert backend == mock_backend
         mock_postgresql.assert_called_once()
 
-    @patch("mini_llm_chat.database_manager.PostgreSQLBackend")
+    @patch("mini_llm_chat.backends.postgresql.PostgreSQLBackend")
     def test_initialize_auto_backend_fallback_to_memory(self, mock_postgresql):
         """Test auto backend selection with fallback to memory."""
         # Make PostgreSQL initialization fail
@@ -219,6 +221,9 @@ class TestConvenienceFunctions:
 
     def setup_method(self):
         """Set up test fixtures."""
+        # Reset the module-level caches so each test resolves its own mock
+        database_manager._BACKEND = None
+        database_manager._USER_TOKEN_CACHE.clear()
         self.mock_backend = Mock()
         self.mock_manager = Mock()
         self.mock_manager.get_backend.return_value = self.mock_backend
@@ -279,12 +284,58 @@ class TestConvenienceFunctions:
         assert result == mock_user
         self.mock_backend.get_session_user.assert_called_once()
 
+    @patch("mini_llm_chat.database_manager.get_database_manager")
+    def test_get_user_by_token_cached(self, mock_get_manager):
+        """Test that repeated token lookups are served from the cache."""
+        mock_get_manager.return_value = self.mock_manager
+        mock_user = Mock()
+        self.mock_backend.get_user_by_token.return_value = mock_user
+
+        from mini_llm_chat.database_manager import get_user_by_token
+
+        assert get_user_by_token("repeated.token") == mock_user
+        assert get_user_by_token("repeated.token") == mock_user
+
+        self.mock_backend.get_user_by_token.assert_called_once_with("repeated.token")
+
+    @patch("mini_llm_chat.database_manager.get_database_manager")
+    def test_invalidate_user_token(self, mock_get_manager):
+        """Test that invalidation forces the next lookup back to the backend."""
+        mock_get_manager.return_value = self.mock_manager
+        mock_user = Mock()
+        self.mock_backend.get_user_by_token.return_value = mock_user
+
+        from mini_llm_chat.database_manager import (
+            get_user_by_token,
+            invalidate_user_token,
+        )
+
+        get_user_by_token("stale.token")
+        invalidate_user_token("stale.token")
+        get_user_by_token("stale.token")
+
+        assert self.mock_backend.get_user_by_token.call_count == 2
+
+    @patch("mini_llm_chat.database_manager.get_database_manager")
+    def test_backend_reference_cached(self, mock_get_manager):
+        """Test that the backend is resolved through the manager only once."""
+        mock_get_manager.return_value = self.mock_manager
+
+        from mini_llm_chat.database_manager import add_message
+
+        add_message(1, "user", "first")
+        add_message(1, "user", "second")
+
+        # The manager indirection happens on the first call only
+        self.mock_manager.get_backend.assert_called_once()
+        assert self.mock_backend.add_message.call_count == 2
+
     @patch("mini_llm_chat.database_manager.get_database_manager")
     def test_get_session_user_not_supported(self, mock_get_manager):
-        """Test get_session_user when backend doesn't support it."""
+        """Test get_session_user when backend has no session user."""
         mock_get_manager.return_value = self.mock_manager
-        # Backend doesn't have get_session_user method
-        del self.mock_backend.get_session_user
+        # Backends without session users return None (the base class default)
+        self.mock_backend.get_session_user.return_value = None
 
         from mini_llm_chat.database_manager import get_session_user
 
@@ -5,14 +5,15 @@ This module provides utilities for checking PostgreSQL installation,
 service status, and performing system-level database operations.
 """
 
+import functools
 import logging
 import os
 import platform
 import shutil
 import subprocess
 import time
-from typing import Dict, Optional, Tuple
-from urllib.parse import urlparse
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +23,14 @@ class PostgreSQLSystemError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=1)
 def is_postgresql_installed() -> bool:
     """
     Check if PostgreSQL is installed on the system.
-    
+
+    The result is cached for the process lifetime; installation status
+    doesn't change while the application is running.
+
     Returns:
         bool: True if PostgreSQL is installed, False otherwise
     """
@@ -50,10 +55,14 @@ def is_postgresql_installed() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def get_postgresql_version() -> Optional[str]:
     """
     Get PostgreSQL version if installed.
-    
+
+    Cached for the process lifetime to avoid re-spawning the version
+    subprocess on repeated status queries.
+
     Returns:
         Optional[str]: PostgreSQL version string or None if not available
     """
@@ -90,13 +99,23 @@ def get_postgresql_version() -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def is_postgresql_service_running() -> bool:
     """
     Check if PostgreSQL service is running.
-    
+
+    Cached for the process lifetime so repeated status queries don't
+    re-spawn pg_isready/service subprocesses; start_postgresql_service
+    clears the cache after changing the service state.
+
     Returns:
         bool: True if PostgreSQL service is running, False otherwise
     """
+    return _probe_postgresql_service()
+
+
+def _probe_postgresql_service() -> bool:
+    """Run the actual (uncached) service status probes."""
     try:
         # Try pg_isready first (most reliable)
         if shutil.which("pg_isready"):
@@ -235,16 +254,21 @@ def start_postgresql_service() -> bool:
         
     try:
         system = platform.system().lower()
-        
+
         if system == "linux":
-            return _start_postgresql_service_linux()
+            started = _start_postgresql_service_linux()
         elif system == "darwin":  # macOS
-            return _start_postgresql_service_macos()
+            started = _start_postgresql_service_macos()
         elif system == "windows":
-            return _start_postgresql_service_windows()
+            started = _start_postgresql_service_windows()
         else:
             logger.warning(f"Unsupported platform for service start: {system}")
             return False
+
+        if started:
+            # Drop the cached "not running" answer now that the service is up
+            is_postgresql_service_running.cache_clear()
+        return started
             
     except Exception as e:
         logger.error(f"Error starting PostgreSQL service: {e}")
@@ -263,9 +287,10 @@ def _start_postgresql_service_linux() -> bool:
                 timeout=30
             )
             if result.returncode == 0:
-                # Wait a moment and check if it's running
+                # Wait a moment and check if it's running (uncached probe;
+                # the cached value may predate the start attempt)
                 time.sleep(2)
-                if is_postgresql_service_running():
+                if _probe_postgresql_service():
                     logger.info("PostgreSQL service started successfully (systemctl)")
                     return True
                     
@@ -279,7 +304,7 @@ def _start_postgresql_service_linux() -> bool:
             )
             if result.returncode == 0:
                 time.sleep(2)
-                if is_postgresql_service_running():
+                if _probe_postgresql_service():
                     logger.info("PostgreSQL service started successfully (service)")
                     return True
                     
@@ -302,7 +327,7 @@ def _start_postgresql_service_macos() -> bool:
             )
             if result.returncode == 0:
                 time.sleep(2)
-                if is_postgresql_service_running():
+                if _probe_postgresql_service():
                     logger.info("PostgreSQL service started successfully (Homebrew)")
                     return True
                     
@@ -324,7 +349,7 @@ def _start_postgresql_service_windows() -> bool:
         )
         if result.returncode == 0:
             time.sleep(2)
-            if is_postgresql_service_running():
+            if _probe_postgresql_service():
                 logger.info("PostgreSQL service started successfully (Windows)")
                 return True
                 
@@ -334,26 +359,41 @@ def _start_postgresql_service_windows() -> bool:
     return False
 
 
-def parse_database_url(database_url: str) -> Dict[str, Optional[str]]:
+class DatabaseURL(NamedTuple):
+    """Parsed components of a PostgreSQL connection URL."""
+
+    scheme: str
+    username: Optional[str]
+    password: Optional[str]
+    host: str
+    port: str
+    database: Optional[str]
+
+
+@functools.lru_cache(maxsize=16)
+def parse_database_url(database_url: str) -> DatabaseURL:
     """
     Parse a PostgreSQL database URL into components.
-    
+
+    Results are cached per URL since the same connection string is parsed
+    at every backend construction. (Failures raise and are not cached.)
+
     Args:
         database_url: PostgreSQL connection URL
-        
+
     Returns:
-        Dict with keys: scheme, username, password, host, port, database
+        DatabaseURL with fields: scheme, username, password, host, port, database
     """
     try:
-        parsed = urlparse(database_url)
-        return {
-            "scheme": parsed.scheme,
-            "username": parsed.username,
-            "password": parsed.password,
-            "host": parsed.hostname or "localhost",
-            "port": str(parsed.port) if parsed.port else "5432",
-            "database": parsed.path.lstrip("/") if parsed.path else None,
-        }
+        parsed = urlsplit(database_url)
+        return DatabaseURL(
+            scheme=parsed.scheme,
+            username=parsed.username,
+            password=parsed.password,
+            host=parsed.hostname or "localhost",
+            port=str(parsed.port) if parsed.port else "5432",
+            database=parsed.path.lstrip("/") if parsed.path else None,
+        )
     except Exception as e:
         logger.error(f"Error parsing database URL: {e}")
         raise ValueError(f"Invalid database URL: {database_url}")
@@ -375,7 +415,7 @@ def database_exists(database_url: str) -> bool:
         
         # Parse the URL
         url_parts = parse_database_url(database_url)
-        target_db = url_parts["database"]
+        target_db = url_parts.database
         
         if not target_db:
             logger.error("No database name specified in URL")
@@ -419,7 +459,7 @@ def create_database(database_url: str) -> bool:
         
         # Parse the URL
         url_parts = parse_database_url(database_url)
-        target_db = url_parts["database"]
+        target_db = url_parts.database
         
         if not target_db:
             logger.error("No database name specified in URL")
@@ -6,18 +6,17 @@ This script tests the new PostgreSQL system checks and initialization
 functionality to ensure it works correctly in various scenarios.
 """
 
+import io
 import os
 import sys
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, TextIO
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from mini_llm_chat.utils.postgresql_utils import (
-    is_postgresql_installed,
-    get_postgresql_version,
-    is_postgresql_service_running,
     get_postgresql_status,
     ensure_postgresql_ready,
     parse_database_url,
@@ -35,34 +34,27 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def test_postgresql_utilities():
+def test_postgresql_utilities(out: TextIO = sys.stdout) -> None:
     """Test PostgreSQL utility functions."""
-    print("="*60)
-    print("Testing PostgreSQL Utilities")
-    print("="*60)
-    
-    # Test installation check
-    print(f"PostgreSQL installed: {is_postgresql_installed()}")
-    
-    # Test version check
-    version = get_postgresql_version()
-    print(f"PostgreSQL version: {version or 'Not available'}")
+    print("="*60, file=out)
+    print("Testing PostgreSQL Utilities", file=out)
+    print("="*60, file=out)
     
-    # Test service status
-    print(f"PostgreSQL service running: {is_postgresql_service_running()}")
-    
-    # Test comprehensive status
+    # One comprehensive status call covers the individual probes
     status = get_postgresql_status()
-    print(f"PostgreSQL status: {status}")
+    print(f"PostgreSQL installed: {status['installed']}", file=out)
+    print(f"PostgreSQL version: {status['version'] or 'Not available'}", file=out)
+    print(f"PostgreSQL service running: {status['service_running']}", file=out)
+    print(f"PostgreSQL status: {status}", file=out)
     
-    print()
+    print(file=out)
 
 
-def test_database_url_parsing():
+def test_database_url_parsing(out: TextIO = sys.stdout) -> None:
     """Test database URL parsing."""
-    print("="*60)
-    print("Testing Database URL Parsing")
-    print("="*60)
+    print("="*60, file=out)
+    print("Testing Database URL Parsing", file=out)
+    print("="*60, file=out)
     
     test_urls = [
         "postgresql://localhost:5432/mini_llm_chat",
@@ -74,38 +66,38 @@ def test_database_url_parsing():
     for url in test_urls:
         try:
             parsed = parse_database_url(url)
-            print(f"URL: {url}")
-            print(f"  Parsed: {parsed}")
+            print(f"URL: {url}", file=out)
+            print(f"  Parsed: {parsed}", file=out)
         except Exception as e:
-            print(f"URL: {url}")
-            print(f"  Error: {e}")
-        print()
+            print(f"URL: {url}", file=out)
+            print(f"  Error: {e}", file=out)
+        print(file=out)
 
 
-def test_postgresql_readiness():
+def test_postgresql_readiness(out: TextIO = sys.stdout) -> None:
     """Test PostgreSQL readiness check."""
-    print("="*60)
-    print("Testing PostgreSQL Readiness")
-    print("="*60)
+    print("="*60, file=out)
+    print("Testing PostgreSQL Readiness", file=out)
+    print("="*60, file=out)
     
     # Test with default database URL
     database_url = os.getenv("DATABASE_URL", "postgresql://localhost:5432/mini_llm_chat_test")
     
     try:
         success, message = ensure_postgresql_ready(database_url)
-        print(f"PostgreSQL ready: {success}")
-        print(f"Message: {message}")
+        print(f"PostgreSQL ready: {success}", file=out)
+        print(f"Message: {message}", file=out)
     except Exception as e:
-        print(f"Error during readiness check: {e}")
+        print(f"Error during readiness check: {e}", file=out)
     
-    print()
+    print(file=out)
 
 
-def test_backend_initialization():
+def test_backend_initialization(out: TextIO = sys.stdout) -> None:
     """Test PostgreSQL backend initialization."""
-    print("="*60)
-    print("Testing Backend Initialization")
-    print("="*60)
+    print("="*60, file=out)
+    print("Testing Backend Initialization", file=out)
+    print("="*60, file=out)
     
     # Test with different scenarios
     test_scenarios = [
@@ -115,7 +107,7 @@ def test_backend_initialization():
     ]
     
     for backend_type, description in test_scenarios:
-        print(f"Testing {description} ({backend_type})...")
+        print(f"Testing {description} ({backend_type})...", file=out)
         try:
             backend = initialize_database(
                 backend_type=backend_type,
@@ -125,45 +117,45 @@ def test_backend_initialization():
             )
             
             backend_info = backend.get_backend_info()
-            print(f"  Success: {backend_info['name']} ({backend_info['type']})")
+            print(f"  Success: {backend_info['name']} ({backend_info['type']})", file=out)
             
         except DatabaseConnectionError as e:
-            print(f"  Failed: {e}")
+            print(f"  Failed: {e}", file=out)
         except Exception as e:
-            print(f"  Unexpected error: {e}")
+            print(f"  Unexpected error: {e}", file=out)
         
-        print()
+        print(file=out)
 
 
-def test_postgresql_backend_direct():
+def test_postgresql_backend_direct(out: TextIO = sys.stdout) -> None:
     """Test PostgreSQL backend directly."""
-    print("="*60)
-    print("Testing PostgreSQL Backend Direct")
-    print("="*60)
+    print("="*60, file=out)
+    print("Testing PostgreSQL Backend Direct", file=out)
+    print("="*60, file=out)
     
     database_url = os.getenv("DATABASE_URL", "postgresql://localhost:5432/mini_llm_chat_test")
     
     try:
         # Create backend instance
         backend = PostgreSQLBackend(database_url)
-        print("Backend created successfully")
+        print("Backend created successfully", file=out)
         
         # Test system readiness
         backend.ensure_postgresql_system_ready()
-        print("System readiness check passed")
+        print("System readiness check passed", file=out)
         
         # Test database readiness
         admin_needed = not backend.ensure_database_ready()
-        print(f"Database ready, admin needed: {admin_needed}")
+        print(f"Database ready, admin needed: {admin_needed}", file=out)
         
         # Get backend info
         info = backend.get_backend_info()
-        print(f"Backend info: {info}")
+        print(f"Backend info: {info}", file=out)
         
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
     
-    print()
+    print(file=out)
 
 
 def main():
@@ -171,22 +163,31 @@ def main():
     print("PostgreSQL Initialization Test Suite")
     print("="*60)
     print()
-    
-    # Test individual utilities
-    test_postgresql_utilities()
-    
-    # Test URL parsing
-    test_database_url_parsing()
-    
-    # Test readiness check
-    test_postgresql_readiness()
-    
-    # Test backend initialization
-    test_backend_initialization()
-    
-    # Test direct backend usage
-    test_postgresql_backend_direct()
-    
+
+    # The stages are independent and I/O-bound (subprocess probes, socket
+    # connects), so run them concurrently. Each stage writes to its own
+    # buffer, which is printed in order afterwards so outputs don't
+    # interleave.
+    stages = [
+        test_postgresql_utilities,
+        test_database_url_parsing,
+        test_postgresql_readiness,
+        test_backend_initialization,
+        test_postgresql_backend_direct,
+    ]
+    buffers = [io.StringIO() for _ in stages]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(stage, buffer)
+            for stage, buffer in zip(stages, buffers)
+        ]
+        for future in futures:
+            future.result()
+
+    for buffer in buffers:
+        sys.stdout.write(buffer.getvalue())
+
     print("="*60)
     print("Test suite completed")
     print("="*60)
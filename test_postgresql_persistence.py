@@ -6,245 +6,274 @@ This script tests whether conversations and messages are properly stored
 and retrieved from PostgreSQL database across different application sessions.
 """
 
+import hashlib
 import os
 import sys
 import time
-from datetime import datetime
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
+from mini_llm_chat.backends import InMemoryBackend
 from mini_llm_chat.backends.postgresql import PostgreSQLBackend
 from mini_llm_chat.database_manager import initialize_database
 
+# Progress output is on by default for interactive runs; CI sets VERBOSE=0
+# so only the pass/fail lines are emitted and per-step stdout writes are
+# skipped entirely.
+VERBOSE = "-v" in sys.argv or os.getenv("VERBOSE", "1").lower() not in ("0", "false")
 
-def test_postgresql_persistence():
-    """Test PostgreSQL persistence across simulated sessions."""
-    print("Testing PostgreSQL conversation persistence across sessions...")
-    print("=" * 60)
+# Fixed test fixture, built once at import. A tuple of tuples so equality
+# checks against fetched rows run as one flat C-level comparison.
+TEST_MESSAGES: tuple = (
+    ("system", "You are a helpful assistant.", 10),
+    ("user", "Hello, this is a test message for persistence.", 15),
+    ("assistant", "Hello! I understand this is a test for PostgreSQL persistence.", 20),
+    ("user", "Can you remember this conversation across sessions?", 12),
+    ("assistant", "Yes, if PostgreSQL persistence is working correctly, this conversation should be remembered.", 25),
+)
+
+
+def message_digest(rows) -> str:
+    """Mirror PostgreSQLBackend.conversation_digest for an expected row set."""
+    joined = "|".join(
+        f"{role}{content}{token_count if token_count is not None else ''}"
+        for role, content, token_count in rows
+    )
+    return hashlib.md5(joined.encode("utf-8")).hexdigest()
+
+
+# Precomputed once: the server-side digest session 2 must report
+EXPECTED_DIGEST = message_digest(TEST_MESSAGES)
+
+
+def vprint(*args, **kwargs):
+    """Print progress output only when verbose mode is enabled."""
+    if VERBOSE:
+        print(*args, **kwargs)
+
+
+def test_postgresql_persistence(backend=None):
+    """Test PostgreSQL persistence across simulated sessions.
+
+    Accepts an already-initialized backend (e.g. main()'s availability
+    probe) so the test doesn't pay a second connection handshake.
+    """
+    vprint("Testing PostgreSQL conversation persistence across sessions...")
+    vprint("=" * 60)
     
     # Test configuration
     test_username = "test_user_persistence"
     test_email = "test@persistence.com"
     test_password = "test_password_123"
-    conversation_title = f"Test Conversation {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    # A nanosecond counter keeps titles unique without a datetime/strftime
+    # round-trip per run
+    conversation_title = f"Test Conversation {time.time_ns()}"
     
     try:
+        # One backend for the whole test: the SQLAlchemy engine pools
+        # connections, so "sessions" are simulated by disposing the pool
+        # (forcing a reconnect) rather than rebuilding the backend and
+        # re-running the auth/SSL handshake and system checks each time.
+        if backend is None:
+            backend = initialize_database(
+                backend_type="postgresql",
+                fallback_to_memory=False,
+                interactive_fallback=False
+            )
+
         # Session 1: Create user, conversation, and messages
-        print("\n[SESSION 1] Creating user, conversation, and messages...")
-        
-        backend1 = initialize_database(
-            backend_type="postgresql",
-            fallback_to_memory=False,
-            interactive_fallback=False
-        )
-        
+        vprint("\n[SESSION 1] Creating user, conversation, and messages...")
+
         # Initialize database tables
-        backend1.init_db()
-        
-        # Create test user
-        user_created = backend1.create_admin_user(test_username, test_email, test_password)
-        if user_created:
-            print(f"+ Created test user: {test_username}")
-        else:
-            print(f"i Test user already exists: {test_username}")
-        
-        # Authenticate user
-        user = backend1.authenticate_user(test_username, test_password)
-        if not user:
-            print("- Failed to authenticate test user")
-            return False
-        print(f"+ Authenticated user: {user.username} (ID: {user.id})")
-        
-        # Create conversation
-        conversation = backend1.create_conversation(user.id, conversation_title)
-        if not conversation:
-            print("- Failed to create conversation")
-            return False
-        print(f"+ Created conversation: '{conversation.title}' (ID: {conversation.id})")
-        
-        # Add test messages
-        test_messages = [
-            ("system", "You are a helpful assistant.", 10),
-            ("user", "Hello, this is a test message for persistence.", 15),
-            ("assistant", "Hello! I understand this is a test for PostgreSQL persistence.", 20),
-            ("user", "Can you remember this conversation across sessions?", 12),
-            ("assistant", "Yes, if PostgreSQL persistence is working correctly, this conversation should be remembered.", 25),
-        ]
-        
-        message_ids = []
-        for role, content, token_count in test_messages:
-            message = backend1.add_message(conversation.id, role, content, token_count)
-            if message:
-                message_ids.append(message.id)
-                print(f"+ Added {role} message: '{content[:50]}...' (ID: {message.id})")
+        backend.init_db()
+        
+        # Group all session-1 writes into one session/transaction so the
+        # whole setup costs a single commit round-trip; synchronous_commit
+        # off skips the WAL fsync wait — safe here, a crashed test is re-run
+        with backend.pipeline(synchronous_commit="off"):
+            # Create test user
+            user_created = backend.create_admin_user(test_username, test_email, test_password)
+            if user_created:
+                vprint(f"+ Created test user: {test_username}")
             else:
-                print(f"- Failed to add {role} message")
+                vprint(f"i Test user already exists: {test_username}")
+
+            # Authenticate user
+            user = backend.authenticate_user(test_username, test_password)
+            if not user:
+                print("- Failed to authenticate test user")
                 return False
+            vprint(f"+ Authenticated user: {user.username} (ID: {user.id})")
+
+            # Create conversation
+            conversation = backend.create_conversation(user.id, conversation_title)
+            if not conversation:
+                print("- Failed to create conversation")
+                return False
+            vprint(f"+ Created conversation: '{conversation.title}' (ID: {conversation.id})")
+
+            # One batched INSERT instead of a round-trip per message
+            created_messages = backend.add_messages(conversation.id, list(TEST_MESSAGES))
+            if len(created_messages) != len(TEST_MESSAGES):
+                print("- Failed to add test messages")
+                return False
+
+        message_ids = []
+        for message in created_messages:
+            message_ids.append(message.id)
+            vprint(f"+ Added {message.role} message: '{message.content[:50]}...' (ID: {message.id})")
         
-        print(f"\n+ Session 1 completed. Created {len(message_ids)} messages in conversation {conversation.id}")
-        
-        # Simulate session end
-        print("\n[SIMULATING] Session 1 ended, database connection closed...")
-        time.sleep(1)
+        vprint(f"\n+ Session 1 completed. Created {len(message_ids)} messages in conversation {conversation.id}")
         
+        # Simulate session end by dropping all pooled connections; the
+        # close/reconnect is what actually exercises cross-session behavior,
+        # no wall-clock delay needed
+        vprint("\n[SIMULATING] Session 1 ended, database connection closed...")
+        backend.close()
+
         # Session 2: Reconnect and verify data persistence
-        print("\n[SESSION 2] Reconnecting and verifying data persistence...")
+        vprint("\n[SESSION 2] Reconnecting and verifying data persistence...")
         
-        backend2 = initialize_database(
-            backend_type="postgresql",
-            fallback_to_memory=False,
-            interactive_fallback=False
-        )
-        
-        # Re-authenticate user
-        user2 = backend2.authenticate_user(test_username, test_password)
+        # Re-authenticate user — the one full credential check kept to prove
+        # auth persistence; later sessions use the cheaper PK lookup
+        user2 = backend.authenticate_user(test_username, test_password)
         if not user2:
             print("- Failed to re-authenticate user in session 2")
             return False
-        print(f"+ Re-authenticated user: {user2.username} (ID: {user2.id})")
+        vprint(f"+ Re-authenticated user: {user2.username} (ID: {user2.id})")
         
         # Verify user data persistence
         if user.id != user2.id or user.username != user2.username:
             print("- User data not consistent across sessions")
             return False
-        print("+ User data consistent across sessions")
+        vprint("+ User data consistent across sessions")
         
-        # Retrieve conversation messages
-        messages = backend2.get_conversation_messages(conversation.id)
-        if not messages:
+        # Verify content, order, and token counts with one server-side
+        # checksum: 32 hex characters cross the wire instead of every row,
+        # and no Python objects are built for the comparison
+        digest = backend.conversation_digest(conversation.id)
+        if digest is None:
             print("- No messages retrieved from conversation")
             return False
-        
-        print(f"+ Retrieved {len(messages)} messages from conversation {conversation.id}")
-        
-        # Verify message content and order
-        if len(messages) != len(test_messages):
-            print(f"- Message count mismatch: expected {len(test_messages)}, got {len(messages)}")
+        if digest != EXPECTED_DIGEST:
+            print("- Message digest mismatch:")
+            print(f"   Expected: {EXPECTED_DIGEST}")
+            print(f"   Got:      {digest}")
             return False
-        
-        for i, (expected_role, expected_content, expected_tokens) in enumerate(test_messages):
-            message = messages[i]
-            if (message.role != expected_role or 
-                message.content != expected_content or 
-                message.token_count != expected_tokens):
-                print(f"- Message {i} content mismatch:")
-                print(f"   Expected: {expected_role} | {expected_content} | {expected_tokens}")
-                print(f"   Got:      {message.role} | {message.content} | {message.token_count}")
-                return False
-            print(f"+ Message {i} verified: {message.role} | '{message.content[:30]}...'")
-        
-        # Test adding new message in session 2
-        new_message = backend2.add_message(
-            conversation.id, 
-            "user", 
-            "This message was added in session 2 to test persistence.", 
-            18
-        )
+        vprint(f"+ All {len(TEST_MESSAGES)} messages verified via server-side digest")
+        
+        # Test adding new message in session 2, also without the fsync wait
+        with backend.pipeline(synchronous_commit="off"):
+            new_message = backend.add_message(
+                conversation.id,
+                "user",
+                "This message was added in session 2 to test persistence.",
+                18,
+            )
         if not new_message:
             print("- Failed to add new message in session 2")
             return False
-        print(f"+ Added new message in session 2 (ID: {new_message.id})")
-        
-        # Session 3: Final verification
-        print("\n[SESSION 3] Final verification of all data...")
-        
-        backend3 = initialize_database(
-            backend_type="postgresql",
-            fallback_to_memory=False,
-            interactive_fallback=False
-        )
-        
-        # Verify all messages including the new one
-        all_messages = backend3.get_conversation_messages(conversation.id)
-        expected_total = len(test_messages) + 1  # Original messages + new message
-        
-        if len(all_messages) != expected_total:
-            print(f"- Final message count incorrect: expected {expected_total}, got {len(all_messages)}")
-            return False
-        
-        print(f"+ Final verification: {len(all_messages)} messages persisted correctly")
+        vprint(f"+ Added new message in session 2 (ID: {new_message.id})")
         
-        # Verify the new message is there
-        last_message = all_messages[-1]
-        if (last_message.role != "user" or 
-            "session 2" not in last_message.content):
-            print("- New message from session 2 not found or incorrect")
-            return False
-        print("+ New message from session 2 verified")
+        # Session 3: Final verification (reconnect again)
+        backend.close()
+        vprint("\n[SESSION 3] Final verification of all data...")
+
+        # The message re-fetch and the user check are independent read-only
+        # verifications; run them concurrently on two pooled connections
+        def verify_final_messages():
+            # One aggregate round-trip returns the count and the newest
+            # message; full content was already verified in session 2, so
+            # there is no need to ship every row again
+            count, last_role, last_content = backend.summarize_conversation(conversation.id)
+            expected_total = len(TEST_MESSAGES) + 1  # Original + new message
+
+            if count != expected_total:
+                return False, f"- Final message count incorrect: expected {expected_total}, got {count}"
+            if last_role != "user" or "session 2" not in (last_content or ""):
+                return False, "- New message from session 2 not found or incorrect"
+            return True, f"+ Final verification: {count} messages persisted correctly (including session 2 addendum)"
+
+        def verify_final_user():
+            # Auth persistence was already proven in session 2; a PK lookup
+            # avoids re-running the bcrypt verification
+            user3 = backend.get_user(user.id)
+            if not user3 or user3.username != user.username:
+                return False, "- User verification failed in session 3"
+            return True, f"+ User verified in session 3 (ID: {user3.id})"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(verify_final_messages),
+                executor.submit(verify_final_user),
+            ]
+            results = [future.result() for future in futures]
+
+        for ok, line in results:
+            if not ok:
+                print(line)
+                return False
+            vprint(line)
         
-        print("\n" + "=" * 60)
+        vprint("\n" + "=" * 60)
         print("SUCCESS: PostgreSQL persistence test PASSED!")
-        print("* User authentication persists across sessions")
-        print("* Conversation data persists across sessions")
-        print("* Message content and order preserved")
-        print("* New messages can be added in subsequent sessions")
-        print("* All data remains consistent across multiple reconnections")
+        vprint("* User authentication persists across sessions")
+        vprint("* Conversation data persists across sessions")
+        vprint("* Message content and order preserved")
+        vprint("* New messages can be added in subsequent sessions")
+        vprint("* All data remains consistent across multiple reconnections")
         
         return True
         
     except Exception as e:
         print(f"\n- ERROR during persistence test: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 
 def test_memory_backend_comparison():
     """Test memory backend to show the difference in persistence."""
-    print("\n" + "=" * 60)
-    print("COMPARISON: Testing memory backend (should NOT persist)")
-    print("=" * 60)
+    vprint("\n" + "=" * 60)
+    vprint("COMPARISON: Testing memory backend (should NOT persist)")
+    vprint("=" * 60)
     
     try:
         # Session 1 with memory backend
-        print("\n[MEMORY SESSION 1] Creating data in memory backend...")
-        
-        backend1 = initialize_database(
-            backend_type="memory",
-            fallback_to_memory=True,
-            interactive_fallback=False
-        )
+        vprint("\n[MEMORY SESSION 1] Creating data in memory backend...")
         
+        backend1 = InMemoryBackend()
+
         backend1.init_db()
-        
+
         # Get session user (memory backend creates a default session user)
-        if hasattr(backend1, 'get_session_user'):
-            session_user = backend1.get_session_user()
-        else:
-            # For backends without get_session_user, try to authenticate with session_user
-            session_user = backend1.authenticate_user("session_user", "anypassword")
-        
+        session_user = backend1.get_session_user()
+
         if not session_user:
             print("- No session user found in memory backend")
             return False
-        
+
         # Create conversation
         conversation = backend1.create_conversation(session_user.id, "Memory Test Conversation")
         if not conversation:
             print("- Failed to create conversation in memory backend")
             return False
-        
+
         # Add message
         message = backend1.add_message(conversation.id, "user", "This is in memory only", 10)
         if not message:
             print("- Failed to add message in memory backend")
             return False
         
-        print(f"+ Created conversation {conversation.id} with message in memory backend")
+        vprint(f"+ Created conversation {conversation.id} with message in memory backend")
         
         # Session 2 with new memory backend instance
-        print("\n[MEMORY SESSION 2] Creating new memory backend instance...")
-        
-        backend2 = initialize_database(
-            backend_type="memory",
-            fallback_to_memory=True,
-            interactive_fallback=False
-        )
+        vprint("\n[MEMORY SESSION 2] Creating new memory backend instance...")
         
+        backend2 = InMemoryBackend()
+
         backend2.init_db()
-        
+
         # Try to retrieve the conversation (should fail)
         messages = backend2.get_conversation_messages(conversation.id)
         
@@ -252,11 +281,11 @@ def test_memory_backend_comparison():
             print("- UNEXPECTED: Memory backend persisted data across instances!")
             return False
         else:
-            print("+ EXPECTED: Memory backend did NOT persist data (conversation lost)")
+            vprint("+ EXPECTED: Memory backend did NOT persist data (conversation lost)")
         
-        print("\n+ Memory backend comparison completed")
-        print("  - Memory backend: Data lost between sessions (as expected)")
-        print("  - PostgreSQL backend: Data persists between sessions")
+        vprint("\n+ Memory backend comparison completed")
+        vprint("  - Memory backend: Data lost between sessions (as expected)")
+        vprint("  - PostgreSQL backend: Data persists between sessions")
         
         return True
         
@@ -267,11 +296,11 @@ def test_memory_backend_comparison():
 
 def main():
     """Main test function."""
-    print("PostgreSQL Persistence Test Suite")
-    print("=" * 60)
-    print("This script tests whether PostgreSQL properly persists")
-    print("conversations and messages across application sessions.")
-    print()
+    vprint("PostgreSQL Persistence Test Suite")
+    vprint("=" * 60)
+    vprint("This script tests whether PostgreSQL properly persists")
+    vprint("conversations and messages across application sessions.")
+    vprint()
     
     # Check if PostgreSQL backend is available
     try:
@@ -281,8 +310,8 @@ def main():
             interactive_fallback=False
         )
         backend_info = backend.get_backend_info()
-        print(f"+ PostgreSQL backend available: {backend_info['name']}")
-        print(f"  Database URL: {backend_info.get('database_url', 'Not specified')}")
+        vprint(f"+ PostgreSQL backend available: {backend_info['name']}")
+        vprint(f"  Database URL: {backend_info.get('database_url', 'Not specified')}")
     except Exception as e:
         print(f"- PostgreSQL backend not available: {e}")
         print("\nPlease ensure:")
@@ -291,16 +320,16 @@ def main():
         print("3. DATABASE_URL environment variable is set correctly")
         sys.exit(1)
     
-    # Run tests
-    success = True
-    
-    # Test PostgreSQL persistence
-    if not test_postgresql_persistence():
-        success = False
-    
-    # Test memory backend for comparison
-    if not test_memory_backend_comparison():
-        success = False
+    # The memory comparison does no external I/O, so it runs in a worker
+    # thread and finishes for free during the PostgreSQL test's network
+    # waits; total wall time becomes max() of the two instead of their sum
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        memory_future = executor.submit(test_memory_backend_comparison)
+        # Test PostgreSQL persistence, reusing the probe backend's connection
+        postgresql_success = test_postgresql_persistence(backend)
+        memory_success = memory_future.result()
+
+    success = postgresql_success and memory_success
     
     # Final result
     print("\n" + "=" * 60)